@@ -1,7 +1,11 @@
-from fastapi import FastAPI
+import heapq
+import math
+import threading
+from collections import Counter
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 app = FastAPI(title="Local Server Monitor Backend")
 
@@ -9,6 +13,29 @@ SERVERS: Dict[int, dict] = {}
 METRICS_LOG: List[dict] = []
 SERVER_CONFIGS: Dict[int, dict] = {}
 
+# Running fleet aggregates, adjusted on every sample so /fleet/summary
+# never has to scan SERVERS.
+FLEET_FIELDS = [
+    "cpu", "memory", "disk", "temperature", "health",
+    "net_up_speed", "net_down_speed", "power_watts", "fan_rpm", "latency",
+]
+FLEET_SUMS: Dict[str, float] = {field: 0.0 for field in FLEET_FIELDS}
+STATUS_COUNTS: Counter = Counter()
+
+# Ranking heaps with lazy invalidation: each entry carries the sample
+# sequence number it was pushed with, and is discarded once the server
+# has reported again.
+SERVER_SEQ: Dict[int, int] = {}
+HOTTEST_HEAP: List[Tuple[float, int, int]] = []  # (-temperature, id, seq)
+UNHEALTHY_HEAP: List[Tuple[float, int, int]] = []  # (health, id, seq)
+FLEET_LOCK = threading.Lock()
+
+# The incremental sums are recomputed exactly every this many samples.
+FLEET_RESYNC_INTERVAL = 1000
+SAMPLES_SINCE_RESYNC = 0
+
+MAX_TOP_K = 50
+
 class MetricPayload(BaseModel):
     server_id: int
     cpu: float
@@ -37,6 +64,56 @@ class ControlPayload(BaseModel):
     target_temp: Optional[float] = None
     auto_restart: Optional[bool] = None
 
+def _resync_fleet_sums():
+    """Recompute the running sums exactly, discarding accumulated float error."""
+    for field in FLEET_FIELDS:
+        FLEET_SUMS[field] = math.fsum(server[field] or 0.0 for server in SERVERS.values())
+
+def _apply_to_fleet(previous: Optional[dict], current: dict):
+    """Swap a server's previous sample for its current one in the aggregates.
+
+    Expects SERVERS to already hold `current`, so a resync sees the new sample.
+    """
+    global SAMPLES_SINCE_RESYNC
+
+    for field in FLEET_FIELDS:
+        FLEET_SUMS[field] += (current[field] or 0.0) - ((previous or {}).get(field) or 0.0)
+
+    if previous is not None:
+        STATUS_COUNTS[previous["status"]] -= 1
+        if STATUS_COUNTS[previous["status"]] <= 0:
+            del STATUS_COUNTS[previous["status"]]
+    STATUS_COUNTS[current["status"]] += 1
+
+    server_id = current["id"]
+    seq = SERVER_SEQ.get(server_id, 0) + 1
+    SERVER_SEQ[server_id] = seq
+    heapq.heappush(HOTTEST_HEAP, (-current["temperature"], server_id, seq))
+    heapq.heappush(UNHEALTHY_HEAP, (current["health"], server_id, seq))
+
+    # Reads only drop stale entries that reach the top of a heap, so each
+    # heap is compacted on its own once its backlog gets too large.
+    for heap in (HOTTEST_HEAP, UNHEALTHY_HEAP):
+        if len(heap) > 4 * len(SERVER_SEQ) + 64:
+            heap[:] = [entry for entry in heap if SERVER_SEQ[entry[1]] == entry[2]]
+            heapq.heapify(heap)
+
+    SAMPLES_SINCE_RESYNC += 1
+    if SAMPLES_SINCE_RESYNC >= FLEET_RESYNC_INTERVAL:
+        _resync_fleet_sums()
+        SAMPLES_SINCE_RESYNC = 0
+
+def _top_k(heap: List[Tuple[float, int, int]], k: int) -> List[dict]:
+    """Return the k best current entries, discarding stale ones as they surface."""
+    valid = []
+    while heap and len(valid) < k:
+        entry = heapq.heappop(heap)
+        if SERVER_SEQ.get(entry[1]) == entry[2]:
+            valid.append(entry)
+    for entry in valid:
+        heapq.heappush(heap, entry)
+    return [SERVERS[server_id] for _, server_id, _ in valid]
+
 @app.post("/metrics/update")
 def update_metrics(payload: MetricPayload):
     data = {
@@ -60,9 +137,18 @@ def update_metrics(payload: MetricPayload):
         
         "last_updated": datetime.now().isoformat()
     }
+
+    # NaN/Infinity parse fine but would poison the running sums and heaps.
+    for field in FLEET_FIELDS:
+        value = data[field]
+        if value is not None and not math.isfinite(value):
+            raise HTTPException(status_code=422, detail=f"{field} must be a finite number")
     
-    SERVERS[payload.server_id] = data
-    METRICS_LOG.append(data)
+    with FLEET_LOCK:
+        previous = SERVERS.get(payload.server_id)
+        SERVERS[payload.server_id] = data
+        METRICS_LOG.append(data)
+        _apply_to_fleet(previous, data)
 
     # Return any pending config for this server
     config = SERVER_CONFIGS.get(payload.server_id, {})
@@ -94,6 +180,30 @@ def get_metrics_history():
 def get_servers():
     return list(SERVERS.values())
 
+def _round_sum(value: float) -> float:
+    # Adding 0.0 turns a rounded-away residue like -1e-13 into 0.0, not -0.0.
+    return round(value, 2) + 0.0
+
+@app.get("/fleet/summary")
+def get_fleet_summary(top_k: int = Query(5, ge=0, le=MAX_TOP_K)):
+    with FLEET_LOCK:
+        count = len(SERVERS)
+        return {
+            "server_count": count,
+            "status_counts": dict(STATUS_COUNTS),
+            "totals": {
+                "power_watts": _round_sum(FLEET_SUMS["power_watts"]),
+                "net_up_speed": _round_sum(FLEET_SUMS["net_up_speed"]),
+                "net_down_speed": _round_sum(FLEET_SUMS["net_down_speed"]),
+            },
+            "averages": {
+                field: _round_sum(FLEET_SUMS[field] / count) if count else 0.0
+                for field in FLEET_FIELDS
+            },
+            "hottest": _top_k(HOTTEST_HEAP, top_k),
+            "least_healthy": _top_k(UNHEALTHY_HEAP, top_k),
+        }
+
 @app.get("/metrics/{server_id}")
 def get_metrics(server_id: int):
     return [m for m in METRICS_LOG if m["id"] == server_id]
@@ -0,0 +1,179 @@
+import math
+import random
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import dummy_receiver as receiver
+
+STATUSES = ["running", "off", "hibernated", "exploded", "disconnected"]
+OPTIONAL_FIELDS = ["net_up_speed", "net_down_speed", "power_watts", "fan_rpm", "latency"]
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    receiver.SERVERS.clear()
+    receiver.METRICS_LOG.clear()
+    receiver.FLEET_SUMS.update({field: 0.0 for field in receiver.FLEET_FIELDS})
+    receiver.STATUS_COUNTS.clear()
+    receiver.SERVER_SEQ.clear()
+    receiver.HOTTEST_HEAP.clear()
+    receiver.UNHEALTHY_HEAP.clear()
+    receiver.SAMPLES_SINCE_RESYNC = 0
+    yield
+
+
+def random_payload(rng, server_id):
+    fields = {
+        "server_id": server_id,
+        "cpu": rng.uniform(0, 100),
+        "memory": rng.uniform(0, 100),
+        "disk": rng.uniform(0, 100),
+        "temperature": rng.uniform(20, 100),
+        "health": rng.uniform(0, 100),
+        "status": rng.choice(STATUSES),
+    }
+    for field in OPTIONAL_FIELDS:
+        fields[field] = None if rng.random() < 0.2 else rng.uniform(0, 500)
+    return receiver.MetricPayload(**fields)
+
+
+def test_summary_matches_brute_force():
+    rng = random.Random(1234)
+    for i in range(5000):
+        receiver.update_metrics(random_payload(rng, rng.randint(1, 30)))
+        # Read every so often so both the read path and compaction get exercised.
+        if i % 97 == 0:
+            receiver.get_fleet_summary(top_k=3)
+
+    top_k = 5
+    summary = receiver.get_fleet_summary(top_k=top_k)
+    servers = list(receiver.SERVERS.values())
+
+    assert summary["server_count"] == len(servers)
+
+    expected_counts = {}
+    for server in servers:
+        expected_counts[server["status"]] = expected_counts.get(server["status"], 0) + 1
+    assert summary["status_counts"] == expected_counts
+
+    for field in receiver.FLEET_FIELDS:
+        expected = math.fsum(server[field] or 0.0 for server in servers) / len(servers)
+        assert summary["averages"][field] == pytest.approx(expected, abs=0.01)
+    expected_power = math.fsum(server["power_watts"] or 0.0 for server in servers)
+    assert summary["totals"]["power_watts"] == pytest.approx(expected_power, abs=0.01)
+
+    hottest = sorted(servers, key=lambda s: (-s["temperature"], s["id"]))[:top_k]
+    assert [s["id"] for s in summary["hottest"]] == [s["id"] for s in hottest]
+    least_healthy = sorted(servers, key=lambda s: (s["health"], s["id"]))[:top_k]
+    assert [s["id"] for s in summary["least_healthy"]] == [s["id"] for s in least_healthy]
+
+    # Compaction keeps the heaps bounded relative to the fleet size.
+    assert len(receiver.HOTTEST_HEAP) <= 4 * len(servers) + 64
+
+
+def test_non_finite_sample_is_rejected():
+    rng = random.Random(0)
+    receiver.update_metrics(random_payload(rng, 1))
+    before = receiver.get_fleet_summary(top_k=5)
+
+    for bad in (float("nan"), float("inf"), float("-inf")):
+        payload = random_payload(rng, 1)
+        payload.temperature = bad
+        with pytest.raises(HTTPException) as exc_info:
+            receiver.update_metrics(payload)
+        assert exc_info.value.status_code == 422
+
+    assert receiver.get_fleet_summary(top_k=5) == before
+
+
+def test_idle_fleet_reports_clean_zeroes():
+    rng = random.Random(42)
+    for _ in range(500):
+        receiver.update_metrics(random_payload(rng, rng.randint(1, 10)))
+
+    for server_id in list(receiver.SERVERS):
+        payload = random_payload(rng, server_id)
+        for field in receiver.FLEET_FIELDS:
+            setattr(payload, field, 0.0)
+        receiver.update_metrics(payload)
+
+    summary = receiver.get_fleet_summary(top_k=5)
+    for field in receiver.FLEET_FIELDS:
+        assert summary["averages"][field] == 0.0
+        assert math.copysign(1.0, summary["averages"][field]) == 1.0
+    for value in summary["totals"].values():
+        assert math.copysign(1.0, value) == 1.0
+
+
+def test_heaps_stay_bounded_with_monotonic_updates_and_reads():
+    # Health and temperature both only fall, so old UNHEALTHY_HEAP entries
+    # never surface on reads while reads keep HOTTEST_HEAP small.
+    server_count = 10
+    for step in range(5000):
+        server_id = step % server_count + 1
+        payload = random_payload(random.Random(step), server_id)
+        payload.health = 100.0 - step * 0.01
+        payload.temperature = 100.0 - step * 0.01
+        receiver.update_metrics(payload)
+        receiver.get_fleet_summary(top_k=5)
+
+    bound = 4 * server_count + 64
+    assert len(receiver.HOTTEST_HEAP) <= bound
+    assert len(receiver.UNHEALTHY_HEAP) <= bound
+
+
+def test_sums_resync_while_reader_polls():
+    rng = random.Random(7)
+    for _ in range(50):
+        receiver.update_metrics(random_payload(rng, rng.randint(1, 5)))
+    receiver.FLEET_SUMS["power_watts"] += 123.0  # simulated drift
+
+    for _ in range(receiver.FLEET_RESYNC_INTERVAL):
+        receiver.update_metrics(random_payload(rng, rng.randint(1, 5)))
+        receiver.get_fleet_summary(top_k=5)
+
+    expected = math.fsum(s["power_watts"] or 0.0 for s in receiver.SERVERS.values())
+    assert receiver.FLEET_SUMS["power_watts"] == pytest.approx(expected, abs=1e-6)
+
+
+def test_non_finite_optional_config_is_accepted():
+    rng = random.Random(0)
+    payload = random_payload(rng, 1)
+    payload.max_memory = float("inf")
+    receiver.update_metrics(payload)
+    assert receiver.get_fleet_summary(top_k=5)["server_count"] == 1
+
+
+def test_http_endpoints():
+    client = TestClient(receiver.app)
+    sample = {
+        "server_id": 1, "cpu": 10, "memory": 20, "disk": 30,
+        "temperature": 50, "health": 90, "status": "running", "power_watts": 200,
+    }
+    assert client.post("/metrics/update", json=sample).status_code == 200
+    assert client.post("/metrics/update", json={**sample, "server_id": 2, "temperature": 70}).status_code == 200
+
+    bad = client.post(
+        "/metrics/update",
+        content='{"server_id": 1, "cpu": 1, "memory": 1, "disk": 1, '
+                '"temperature": NaN, "health": 1, "status": "running"}',
+        headers={"content-type": "application/json"},
+    )
+    assert bad.status_code == 422
+
+    response = client.get("/fleet/summary", params={"top_k": 1})
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["server_count"] == 2
+    assert summary["status_counts"] == {"running": 2}
+    assert summary["totals"]["power_watts"] == 400.0
+    assert summary["averages"]["temperature"] == 60.0
+    assert [s["id"] for s in summary["hottest"]] == [2]
+
+    assert client.get("/fleet/summary", params={"top_k": -1}).status_code == 422
+    assert client.get("/fleet/summary", params={"top_k": receiver.MAX_TOP_K + 1}).status_code == 422